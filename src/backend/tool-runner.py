@@ -28,6 +28,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Memory-backed block devices that never hold scanned files
+VIRTUAL_DISK_PREFIXES = ("loop", "ram", "zram")
+
 class KnouxToolRunner:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
@@ -51,6 +54,14 @@ class KnouxToolRunner:
         # Running processes
         self.running_processes: Dict[str, subprocess.Popen] = {}
         
+        # Output drained from running processes, so full pipes never block them
+        self.process_output: Dict[str, Dict[str, Any]] = {}
+        
+        # Metrics feeds read by tools running with adaptive throttling
+        self.metrics_feeds: Dict[str, Path] = {}
+        self.monitor_thread: Optional[threading.Thread] = None
+        self._last_disk_busy = None
+        
         logger.info("KnouxToolRunner initialized")
 
     def load_sections(self) -> Dict:
@@ -84,8 +95,11 @@ class KnouxToolRunner:
     def save_state(self):
         """Save current state to file"""
         self.state["last_update"] = datetime.now().isoformat()
-        with open(self.state_file, 'w', encoding='utf-8') as f:
+        # Write then rename, so the monitor thread never leaves a truncated file
+        tmp_file = self.state_file.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
 
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get real-time system metrics"""
@@ -101,6 +115,13 @@ class KnouxToolRunner:
             # Disk metrics
             disk = psutil.disk_usage('/')
             disk_io = psutil.disk_io_counters()
+            disk_busy_percent = self.get_disk_busy_percent()
+            
+            # Load average (emulated by psutil on Windows)
+            try:
+                load_1min = psutil.getloadavg()[0]
+            except (AttributeError, OSError):
+                load_1min = 0.0
             
             # Network metrics
             network = psutil.net_io_counters()
@@ -127,7 +148,12 @@ class KnouxToolRunner:
                     "used_gb": round(disk.used / (1024**3), 2),
                     "percent": round((disk.used / disk.total) * 100, 1),
                     "read_bytes": disk_io.read_bytes if disk_io else 0,
-                    "write_bytes": disk_io.write_bytes if disk_io else 0
+                    "write_bytes": disk_io.write_bytes if disk_io else 0,
+                    "busy_percent": disk_busy_percent
+                },
+                "load": {
+                    "avg_1min": round(load_1min, 2),
+                    "per_cpu": round(load_1min / cpu_count, 2) if cpu_count else 0.0
                 },
                 "network": {
                     "bytes_sent": network.bytes_sent,
@@ -149,6 +175,105 @@ class KnouxToolRunner:
             logger.error(f"Error getting system metrics: {e}")
             return {}
 
+    def get_disk_busy_percent(self) -> float:
+        """Utilization of the busiest disk since the previous sample, from per-device busy time"""
+        # Aggregate counters sum busy time over all devices, hiding one saturated disk
+        try:
+            per_disk = psutil.disk_io_counters(perdisk=True) or {}
+        except (OSError, RuntimeError):
+            return 0.0
+        busy_times = {
+            name: counters.busy_time for name, counters in per_disk.items()
+            if getattr(counters, "busy_time", None) is not None
+            and not name.startswith(VIRTUAL_DISK_PREFIXES)
+        }
+        if not busy_times:
+            return 0.0
+        
+        now = time.monotonic()
+        previous = self._last_disk_busy
+        self._last_disk_busy = (now, busy_times)
+        if previous is None or now <= previous[0]:
+            return 0.0
+        
+        elapsed_ms = (now - previous[0]) * 1000
+        busiest = max(
+            (busy_time - previous[1][name] for name, busy_time in busy_times.items()
+             if name in previous[1]),
+            default=0)
+        return round(min(100.0, max(0.0, busiest / elapsed_ms * 100)), 1)
+
+    def write_metrics_feeds(self, metrics: Dict[str, Any]):
+        """Publish the latest metrics to tools running with adaptive throttling"""
+        for tool_id, feed_path in list(self.metrics_feeds.items()):
+            try:
+                tmp_path = feed_path.with_suffix(".tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(metrics, f, ensure_ascii=False)
+                os.replace(tmp_path, feed_path)
+            except Exception as e:
+                logger.error(f"Error writing metrics feed for {tool_id}: {e}")
+
+    def remove_metrics_feed(self, tool_id: str):
+        """Stop publishing metrics for a tool"""
+        feed_path = self.metrics_feeds.pop(tool_id, None)
+        if feed_path:
+            feed_path.unlink(missing_ok=True)
+
+    def build_throttle_args(self, tool_id: str, throttle: Dict[str, Any]) -> List[str]:
+        """Translate a per-run throttle config into tool arguments"""
+        flags = {
+            "max_bytes_per_sec": "--max-bytes-per-sec",
+            "max_files_per_sec": "--max-files-per-sec",
+            "workers": "--workers",
+            "target_cpu_percent": "--target-cpu-percent",
+            "target_disk_busy_percent": "--target-disk-busy-percent",
+            "target_load_per_cpu": "--target-load-per-cpu",
+            "sample_interval": "--sample-interval",
+        }
+        args = []
+        for key, flag in flags.items():
+            if throttle.get(key) is not None:
+                args += [flag, str(throttle[key])]
+        
+        if throttle.get("adaptive"):
+            feed_dir = self.data_dir / "metrics"
+            feed_dir.mkdir(exist_ok=True)
+            feed_path = feed_dir / f"{tool_id}.json"
+            self.metrics_feeds[tool_id] = feed_path
+            args += ["--adaptive", "--metrics-feed", str(feed_path.resolve())]
+        
+        return args
+
+    def start_output_readers(self, tool_id: str, process: subprocess.Popen):
+        """Read a process's stdout and stderr in background threads"""
+        output = {"stdout": [], "stderr": [], "threads": []}
+        
+        def drain(stream, chunks: List[str]):
+            for line in stream:
+                chunks.append(line)
+            stream.close()
+        
+        for name in ("stdout", "stderr"):
+            stream = getattr(process, name)
+            if stream is None:
+                continue
+            thread = threading.Thread(target=drain, args=(stream, output[name]), daemon=True)
+            thread.start()
+            output["threads"].append(thread)
+        
+        self.process_output[tool_id] = output
+
+    def collect_process_output(self, tool_id: str, process: subprocess.Popen):
+        """Return the full stdout and stderr of a finished process"""
+        output = self.process_output.pop(tool_id, None)
+        if output is None:
+            return process.communicate()
+        
+        for thread in output["threads"]:
+            thread.join()
+        return "".join(output["stdout"]), "".join(output["stderr"])
+
     def find_tool(self, tool_id: str) -> Optional[Dict]:
         """Find tool configuration by ID"""
         for section in self.sections.get("sections", []):
@@ -206,8 +331,9 @@ class KnouxToolRunner:
             encoding='utf-8'
         )
 
-    def run_tool(self, tool_id: str, args: List[str] = None) -> Dict[str, Any]:
-        """Execute a tool by ID"""
+    def run_tool(self, tool_id: str, args: List[str] = None,
+                 throttle: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute a tool by ID, optionally with an I/O throttle config for this run"""
         tool = self.find_tool(tool_id)
         if not tool:
             return {
@@ -224,6 +350,19 @@ class KnouxToolRunner:
                 "tool_id": tool_id
             }
 
+        if throttle:
+            if not tool.get("supportsThrottle"):
+                return {
+                    "success": False,
+                    "error": f"Tool {tool_id} does not support I/O throttling",
+                    "tool_id": tool_id
+                }
+            args = (args or []) + self.build_throttle_args(tool_id, throttle)
+            if throttle.get("adaptive"):
+                # Write an initial sample so the tool has data from its first file
+                self.write_metrics_feeds(self.get_system_metrics())
+                self.monitor_system(interval=throttle.get("sample_interval", 2))
+
         try:
             # Determine execution method based on file extension or type
             script_type = tool.get("type", "").lower()
@@ -234,6 +373,7 @@ class KnouxToolRunner:
             elif script_path.suffix == ".js":
                 process = self.execute_node_script(script_path, args)
             else:
+                self.remove_metrics_feed(tool_id)
                 return {
                     "success": False,
                     "error": f"Unsupported script type: {script_path.suffix}",
@@ -241,6 +381,7 @@ class KnouxToolRunner:
                 }
 
             # Store running process
+            self.start_output_readers(tool_id, process)
             self.running_processes[tool_id] = process
             
             # Update execution state
@@ -250,7 +391,8 @@ class KnouxToolRunner:
                 "start_time": datetime.now().isoformat(),
                 "pid": process.pid,
                 "script_path": str(script_path),
-                "args": args or []
+                "args": args or [],
+                "throttle": throttle or {}
             }
             
             self.state["tool_executions"][tool_id] = execution_state
@@ -267,6 +409,7 @@ class KnouxToolRunner:
             }
             
         except Exception as e:
+            self.remove_metrics_feed(tool_id)
             logger.error(f"Error running tool {tool_id}: {e}")
             return {
                 "success": False,
@@ -295,6 +438,8 @@ class KnouxToolRunner:
                 
             # Remove from running processes
             del self.running_processes[tool_id]
+            self.process_output.pop(tool_id, None)
+            self.remove_metrics_feed(tool_id)
             
             # Update execution state
             if tool_id in self.state["tool_executions"]:
@@ -332,12 +477,9 @@ class KnouxToolRunner:
                 }
             else:
                 # Process has finished
-                stdout, stderr = process.communicate()
+                stdout, stderr = self.collect_process_output(tool_id, process)
                 return_code = process.returncode
                 
-                # Remove from running processes
-                del self.running_processes[tool_id]
-                
                 # Update execution state
                 execution_state = self.state["tool_executions"].get(tool_id, {})
                 execution_state.update({
@@ -350,6 +492,10 @@ class KnouxToolRunner:
                 self.state["tool_executions"][tool_id] = execution_state
                 self.save_state()
                 
+                # Remove from running processes once the final state is recorded
+                self.running_processes.pop(tool_id, None)
+                self.remove_metrics_feed(tool_id)
+                
                 return {
                     "tool_id": tool_id,
                     "status": "completed" if return_code == 0 else "error",
@@ -429,18 +575,23 @@ class KnouxToolRunner:
 
     def monitor_system(self, interval: int = 5):
         """Monitor system and update metrics periodically"""
+        if self.monitor_thread and self.monitor_thread.is_alive():
+            return
+        
         def monitor_loop():
             while True:
                 try:
-                    self.get_system_metrics()
+                    metrics = self.get_system_metrics()
+                    if metrics:
+                        self.write_metrics_feeds(metrics)
                     self.cleanup_finished_processes()
                     time.sleep(interval)
                 except Exception as e:
                     logger.error(f"Error in monitor loop: {e}")
                     time.sleep(interval)
         
-        monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        monitor_thread.start()
+        self.monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
+        self.monitor_thread.start()
         logger.info(f"System monitoring started with {interval}s interval")
 
 def main():
@@ -455,14 +606,35 @@ def main():
     parser.add_argument("--metrics", action="store_true", help="Get system metrics")
     parser.add_argument("--monitor", action="store_true", help="Start system monitoring")
     parser.add_argument("--simulate", help="Simulate duplicate detection on path")
+    parser.add_argument("--max-bytes-per-sec", type=float, help="I/O bandwidth limit for --run")
+    parser.add_argument("--max-files-per-sec", type=float, help="File open rate limit for --run")
+    parser.add_argument("--workers", type=int, help="Worker count for --run")
+    parser.add_argument("--adaptive", action="store_true",
+                       help="Back off --run when system load or disk utilization is high")
+    parser.add_argument("tool_args", nargs="*",
+                       help="Arguments passed to the tool for --run (after --)")
     
     args = parser.parse_args()
     
     runner = KnouxToolRunner()
     
     if args.run:
-        result = runner.run_tool(args.run)
+        throttle = {
+            "max_bytes_per_sec": args.max_bytes_per_sec,
+            "max_files_per_sec": args.max_files_per_sec,
+            "workers": args.workers,
+            "adaptive": args.adaptive
+        }
+        if not any(throttle.values()):
+            throttle = None
+        result = runner.run_tool(args.run, args.tool_args, throttle)
         print(json.dumps(result, indent=2, ensure_ascii=False))
+        
+        if result.get("success") and args.adaptive:
+            # Keep feeding metrics until the monitor sees the tool finish
+            while args.run in runner.running_processes:
+                time.sleep(1)
+            print(json.dumps(runner.get_tool_status(args.run), indent=2, ensure_ascii=False))
     
     elif args.stop:
         result = runner.stop_tool(args.stop)
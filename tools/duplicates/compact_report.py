@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Knoux SmartOrganizer - Compact Duplicate Report
+Columnar, dictionary-encoded report format that can be memory-mapped and paged
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Dict, Optional, Iterator, Any
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KNXRPT\x00\x01"
+VERSION = 2
+
+# Group type codes stored in the type column
+GROUP_TYPES = ("exact", "similar")
+TYPE_CODES = {name: code for code, name in enumerate(GROUP_TYPES)}
+
+HASH_BYTES = 32  # raw SHA256 digest
+
+# Sections in file order: (name, array typecode)
+SECTIONS = (
+    ("meta", "B"),            # UTF-8 JSON: everything in the report except the groups
+    ("path_offsets", "Q"),    # n_paths + 1 offsets into path_blob
+    ("path_blob", "B"),       # UTF-8 paths, each path stored once
+    ("group_type", "B"),      # one type code per group
+    ("group_size_mb", "d"),
+    ("group_similarity", "d"),
+    ("group_hash", "B"),      # HASH_BYTES per group, zeroed for similar groups
+    ("member_offsets", "Q"),  # n_groups + 1 offsets into members
+    ("members", "I"),         # path ids
+    ("size_order", "I"),      # group ids sorted by size_mb, largest first
+    ("type_order", "I"),      # size_order partitioned by type, in GROUP_TYPES order
+    ("type_file_order", "I"), # group ids partitioned by type, in file order
+)
+SECTION_INDEX = {name: i for i, (name, _) in enumerate(SECTIONS)}
+
+# magic, version, section count, n_groups, n_paths, n_members, per-type group counts
+_HEADER = struct.Struct("<8sHHQQQ" + "Q" * len(GROUP_TYPES))
+_SECTION_ENTRY = struct.Struct("<QQ")
+HEADER_SIZE = _HEADER.size + _SECTION_ENTRY.size * len(SECTIONS)
+
+ALIGNMENT = 8
+
+
+def _to_little_endian(column: array) -> array:
+    """Return column with little-endian byte order for writing"""
+    if sys.byteorder != "little" and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+def is_compact_report(path: Path) -> bool:
+    """Check whether a file starts with the compact report magic"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_compact_report(report: Dict, output_path: Path) -> Path:
+    """Write a scanner report (as returned by generate_report) in compact format"""
+    output_path = Path(output_path)
+    duplicate_groups = report.get("duplicate_groups", [])
+
+    meta = {k: v for k, v in report.items() if k != "duplicate_groups"}
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+    # Dictionary-encode paths
+    path_ids: Dict[str, int] = {}
+    path_offsets = array("Q", [0])
+    path_blob = bytearray()
+
+    group_type = array("B")
+    group_size_mb = array("d")
+    group_similarity = array("d")
+    group_hash = bytearray()
+    member_offsets = array("Q", [0])
+    members = array("I")
+
+    for group in duplicate_groups:
+        group_type.append(TYPE_CODES[group["type"]])
+        group_size_mb.append(float(group.get("size_mb", 0.0)))
+        group_similarity.append(float(group.get("similarity", 0.0)))
+
+        file_hash = group.get("hash")
+        group_hash += bytes.fromhex(file_hash) if file_hash else bytes(HASH_BYTES)
+
+        for file_path in group["files"]:
+            path_id = path_ids.get(file_path)
+            if path_id is None:
+                path_id = len(path_ids)
+                path_ids[file_path] = path_id
+                path_blob += file_path.encode("utf-8")
+                path_offsets.append(len(path_blob))
+            members.append(path_id)
+        member_offsets.append(len(members))
+
+    n_groups = len(group_type)
+    size_order = array("I", sorted(range(n_groups), key=lambda i: -group_size_mb[i]))
+    type_counts = [0] * len(GROUP_TYPES)
+    for code in group_type:
+        type_counts[code] += 1
+    type_order = array("I")
+    for code in range(len(GROUP_TYPES)):
+        type_order.extend(i for i in size_order if group_type[i] == code)
+    type_file_order = array("I")
+    for code in range(len(GROUP_TYPES)):
+        type_file_order.extend(i for i in range(n_groups) if group_type[i] == code)
+
+    columns = {
+        "meta": meta_bytes,
+        "path_offsets": path_offsets,
+        "path_blob": path_blob,
+        "group_type": group_type,
+        "group_size_mb": group_size_mb,
+        "group_similarity": group_similarity,
+        "group_hash": group_hash,
+        "member_offsets": member_offsets,
+        "members": members,
+        "size_order": size_order,
+        "type_order": type_order,
+        "type_file_order": type_file_order,
+    }
+
+    # Write to a temporary file and swap it in so readers never see a partial report
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    section_table = []
+    with open(tmp_path, 'wb') as f:
+        f.write(bytes(HEADER_SIZE))
+        for name, _ in SECTIONS:
+            padding = -f.tell() % ALIGNMENT
+            f.write(bytes(padding))
+            offset = f.tell()
+            column = columns[name]
+            data = _to_little_endian(column).tobytes() if isinstance(column, array) else bytes(column)
+            f.write(data)
+            section_table.append((offset, len(data)))
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, len(SECTIONS), n_groups,
+                             len(path_ids), len(members), *type_counts))
+        for offset, length in section_table:
+            f.write(_SECTION_ENTRY.pack(offset, length))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, output_path)
+    logger.info(f"Compact report written: {n_groups} groups, {len(path_ids)} unique paths")
+    return output_path
+
+
+class _ColumnSlice:
+    """Window over a mapped column that indexes into it without creating a new view"""
+
+    def __init__(self, column, start: int, stop: int):
+        self._column = column
+        self._start = start
+        self._length = stop - start
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._column[self._start + index]
+
+
+class CompactReport:
+    """Memory-mapped reader for compact duplicate reports"""
+
+    def __init__(self, report_path: Path):
+        self.report_path = Path(report_path)
+        self._views: List[memoryview] = []
+        self._mmap = None
+        self._file = open(self.report_path, 'rb')
+
+        # mmap cannot map an empty file, so check the size first
+        if os.fstat(self._file.fileno()).st_size < HEADER_SIZE:
+            self.close()
+            raise ValueError(f"Not a compact report: {self.report_path}")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.close()
+            raise
+
+        header = _HEADER.unpack_from(self._mmap, 0)
+        magic, version, section_count = header[:3]
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a compact report: {self.report_path}")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported compact report version: {version}")
+        if section_count != len(SECTIONS):
+            self.close()
+            raise ValueError(f"Not a compact report: {self.report_path}")
+
+        self.group_count, self.path_count, self.member_count = header[3:6]
+        self.type_counts = dict(zip(GROUP_TYPES, header[6:]))
+
+        self._sections = [
+            _SECTION_ENTRY.unpack_from(self._mmap, _HEADER.size + i * _SECTION_ENTRY.size)
+            for i in range(len(SECTIONS))
+        ]
+        if any(offset + length > len(self._mmap) for offset, length in self._sections):
+            self.close()
+            raise ValueError(f"Truncated compact report: {self.report_path}")
+
+        self._path_offsets = self._column("path_offsets")
+        self._path_blob = self._column("path_blob")
+        self._group_type = self._column("group_type")
+        self._group_size_mb = self._column("group_size_mb")
+        self._group_similarity = self._column("group_similarity")
+        self._group_hash = self._column("group_hash")
+        self._member_offsets = self._column("member_offsets")
+        self._members = self._column("members")
+        self._size_order = self._column("size_order")
+        self._type_order = self._column("type_order")
+        self._type_file_order = self._column("type_file_order")
+
+        self._meta: Optional[Dict] = None
+
+    def _column(self, name: str):
+        """Map a section as a typed, zero-copy column"""
+        index = SECTION_INDEX[name]
+        typecode = SECTIONS[index][1]
+        offset, length = self._sections[index]
+        view = memoryview(self._mmap)[offset:offset + length]
+        self._views.append(view)
+        if typecode == "B":
+            return view
+        if sys.byteorder != "little":
+            # Fall back to an in-memory copy on big-endian hosts
+            column = array(typecode, view.tobytes())
+            column.byteswap()
+            return column
+        view = view.cast(typecode)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        """Release the memory map"""
+        for view in reversed(getattr(self, "_views", [])):
+            view.release()
+        self._views = []
+        if getattr(self, "_mmap", None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.group_count
+
+    @property
+    def meta(self) -> Dict:
+        """Report fields other than the duplicate groups (scan_summary, timestamp, ...)"""
+        if self._meta is None:
+            offset, length = self._sections[SECTION_INDEX["meta"]]
+            self._meta = json.loads(self._mmap[offset:offset + length].decode("utf-8"))
+        return self._meta
+
+    @property
+    def scan_summary(self) -> Dict:
+        return self.meta.get("scan_summary", {})
+
+    def get_path(self, path_id: int) -> str:
+        """Decode a path from the path dictionary"""
+        start = self._path_offsets[path_id]
+        end = self._path_offsets[path_id + 1]
+        return bytes(self._path_blob[start:end]).decode("utf-8")
+
+    def get_group(self, group_id: int) -> Dict:
+        """Decode a single duplicate group in the same shape as the JSON report"""
+        if not 0 <= group_id < self.group_count:
+            raise IndexError(f"Group {group_id} out of range")
+
+        group_type = GROUP_TYPES[self._group_type[group_id]]
+        start = self._member_offsets[group_id]
+        end = self._member_offsets[group_id + 1]
+
+        group: Dict[str, Any] = {"type": group_type}
+        if group_type == "exact":
+            digest = self._group_hash[group_id * HASH_BYTES:(group_id + 1) * HASH_BYTES]
+            group["hash"] = bytes(digest).hex()
+        group["files"] = [self.get_path(self._members[i]) for i in range(start, end)]
+        group["size_mb"] = self._group_size_mb[group_id]
+        group["similarity"] = self._group_similarity[group_id]
+        return group
+
+    def _ordered_ids(self, sort_by: Optional[str], group_type: Optional[str]):
+        """Return a sequence of group ids for the requested ordering and filter"""
+        if group_type is not None and group_type not in TYPE_CODES:
+            raise ValueError(f"Unknown group type: {group_type}")
+        if sort_by not in (None, "size_mb"):
+            raise ValueError(f"Unsupported sort key: {sort_by}")
+
+        if group_type is None:
+            return self._size_order if sort_by == "size_mb" else range(self.group_count)
+
+        start = 0
+        for name in GROUP_TYPES:
+            if name == group_type:
+                break
+            start += self.type_counts[name]
+        column = self._type_order if sort_by == "size_mb" else self._type_file_order
+        return _ColumnSlice(column, start, start + self.type_counts[group_type])
+
+    def count(self, group_type: Optional[str] = None) -> int:
+        """Number of groups, optionally of one type"""
+        if group_type is None:
+            return self.group_count
+        return self.type_counts[group_type]
+
+    def page(self, page: int = 0, page_size: int = 100, sort_by: Optional[str] = "size_mb",
+             descending: bool = True, group_type: Optional[str] = None) -> Dict:
+        """Return one page of duplicate groups without decoding the rest of the report"""
+        if page < 0 or page_size <= 0:
+            raise ValueError("page must be >= 0 and page_size > 0")
+
+        ids = self._ordered_ids(sort_by, group_type)
+        total = len(ids)
+        start = page * page_size
+        end = min(start + page_size, total)
+
+        if descending or sort_by is None:
+            selected = [ids[i] for i in range(start, end)]
+        else:
+            selected = [ids[total - 1 - i] for i in range(start, end)]
+
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total_groups": total,
+            "total_pages": (total + page_size - 1) // page_size,
+            "sort_by": sort_by,
+            "descending": descending,
+            "type": group_type,
+            "duplicate_groups": [self.get_group(group_id) for group_id in selected],
+        }
+
+    def iter_groups(self, sort_by: Optional[str] = None,
+                    group_type: Optional[str] = None) -> Iterator[Dict]:
+        """Iterate over groups one at a time"""
+        for group_id in self._ordered_ids(sort_by, group_type):
+            yield self.get_group(group_id)
+
+    def export_json(self, output_path: Path):
+        """Export the full report in the original JSON format, streaming group by group"""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write("{\n")
+            for key, value in self.meta.items():
+                if key == "duplicate_groups":
+                    continue
+                f.write(f"  {json.dumps(key)}: ")
+                f.write(json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+                f.write(",\n")
+            f.write('  "duplicate_groups": [')
+            for i, group in enumerate(self.iter_groups()):
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(group, indent=2, ensure_ascii=False).replace("\n", "\n    "))
+            f.write("\n  ]\n}\n" if self.group_count else "]\n}\n")
+        logger.info(f"📄 JSON report exported to: {output_path}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compact Duplicate Report Reader")
+    parser.add_argument("report", help="Compact report file path")
+    parser.add_argument("--page", type=int, default=0, help="Page number (0-based)")
+    parser.add_argument("--page-size", type=int, default=100, help="Groups per page")
+    parser.add_argument("--sort", choices=["size_mb", "none"], default="size_mb",
+                       help="Sort key")
+    parser.add_argument("--ascending", action="store_true",
+                       help="Sort smallest groups first")
+    parser.add_argument("--type", choices=list(GROUP_TYPES), help="Only show groups of this type")
+    parser.add_argument("--summary", action="store_true", help="Print the scan summary only")
+    parser.add_argument("--export-json", help="Export the full report as JSON to this path")
+
+    args = parser.parse_args()
+
+    report_path = Path(args.report)
+    if not report_path.exists():
+        logger.error(f"Report does not exist: {report_path}")
+        sys.exit(1)
+
+    try:
+        with CompactReport(report_path) as report:
+            if args.export_json:
+                report.export_json(Path(args.export_json))
+            elif args.summary:
+                print(json.dumps(report.meta, indent=2, ensure_ascii=False))
+            else:
+                result = report.page(
+                    page=args.page,
+                    page_size=args.page_size,
+                    sort_by=None if args.sort == "none" else args.sort,
+                    descending=not args.ascending,
+                    group_type=args.type,
+                )
+                print(json.dumps(result, indent=2, ensure_ascii=False))
+    except Exception as e:
+        logger.error(f"❌ Failed to read report: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
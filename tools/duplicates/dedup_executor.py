@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""
+Knoux SmartOrganizer - Bulk Duplicate Executor
+Reclaims space from a scanner report using reflinks, hardlinks or deletion,
+with a write-ahead journal so interrupted runs can be resumed or undone
+"""
+
+import os
+import sys
+import json
+import errno
+import hashlib
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Optional, Iterator, Tuple
+import logging
+
+from compact_report import CompactReport, is_compact_report
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METHODS = ("reflink", "hardlink", "delete")
+FICLONE = 0x40049409  # Linux ioctl: share extents of another file
+TMP_SUFFIX = ".knxdedup"
+
+# Errors that mean "this filesystem cannot do that"; cached per device pair
+CAPABILITY_ERRNOS = {
+    errno.EINVAL, errno.ENOTTY,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL), getattr(errno, "ENOTSUP", errno.EINVAL),
+}
+
+# Errors that only rule out a method for this keeper/target pair
+PAIR_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK}
+
+
+class MethodUnsupported(Exception):
+    """Raised when a link method cannot be used; cacheable if the filesystem lacks it"""
+
+    def __init__(self, method: str, cacheable: bool = False):
+        super().__init__(method)
+        self.method = method
+        self.cacheable = cacheable
+
+
+def calculate_file_hash(file_path: Path) -> str:
+    """Calculate SHA256 hash of file"""
+    hasher = hashlib.sha256()
+    try:
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    except Exception as e:
+        logger.error(f"Error hashing {file_path}: {e}")
+        return ""
+
+
+def _iter_report_file(report_path: Path) -> Iterator[Dict]:
+    if is_compact_report(report_path):
+        with CompactReport(report_path) as report:
+            yield from report.iter_groups()
+        return
+
+    with open(report_path, 'r', encoding='utf-8') as f:
+        yield from json.load(f).get("duplicate_groups", [])
+
+
+def load_report(source: str) -> Tuple[Iterator[Dict], Dict]:
+    """Open a JSON report, a compact report, or '-' for stdin
+
+    Returns the duplicate groups and an identity recorded in the journal, so a
+    resumed run can tell whether it was given the same report.
+    """
+    if source == "-":
+        data = sys.stdin.read()
+        identity = {"path": "-", "sha256": hashlib.sha256(data.encode("utf-8")).hexdigest()}
+        return iter(json.loads(data).get("duplicate_groups", [])), identity
+
+    report_path = Path(source)
+    report_stat = report_path.stat()
+    identity = {
+        "path": str(report_path.resolve()),
+        "size": report_stat.st_size,
+        "mtime_ns": report_stat.st_mtime_ns,
+    }
+    return _iter_report_file(report_path), identity
+
+
+class DedupJournal:
+    """Append-only JSON Lines write-ahead journal"""
+
+    def __init__(self, journal_path: Path):
+        self.journal_path = Path(journal_path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def exists(self) -> bool:
+        return self.journal_path.exists()
+
+    def load(self) -> List[Dict]:
+        """Read all complete records; a torn final line from a crash is ignored"""
+        records = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring incomplete journal record in {self.journal_path}")
+        return records
+
+    def append(self, record: Dict):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def sync(self):
+        """Flush records to stable storage"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class DedupExecutor:
+    def __init__(self, journal_path: Path, method: str = "auto", workers: int = 4,
+                 batch_size: int = 64, dry_run: bool = False):
+        if method != "auto" and method not in METHODS:
+            raise ValueError(f"Unknown method: {method}")
+        self.journal = DedupJournal(journal_path)
+        self.method = method
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        self.methods = list(METHODS) if method == "auto" else [method]
+
+        # (keeper_dev, target_dev, method) known not to work, so we stop retrying them
+        self._unsupported = set()
+        self._keeper_hashes: Dict[tuple, str] = {}
+        self._keeper_lock = threading.Lock()
+        # Set when operations come from an existing journal rather than a fresh plan
+        self._resuming = False
+
+    def plan(self, groups: Iterator[Dict]) -> List[Dict]:
+        """Turn exact duplicate groups into per-file operations"""
+        operations = []
+        similar_groups = 0
+
+        for group_index, group in enumerate(groups):
+            if group.get("type") != "exact" or not group.get("hash"):
+                # Similar images are not byte-identical and are never replaced
+                similar_groups += 1
+                continue
+
+            files = [Path(f) for f in group["files"]]
+            keeper = files[0]
+            try:
+                keeper_stat = keeper.stat()
+            except OSError as e:
+                logger.warning(f"Skipping group {group_index}, keeper unavailable: {e}")
+                continue
+
+            for target in files[1:]:
+                if target == keeper or target.is_symlink():
+                    continue
+                try:
+                    target_stat = target.stat()
+                except OSError as e:
+                    logger.warning(f"Skipping {target}: {e}")
+                    continue
+                operations.append({
+                    "seq": len(operations),
+                    "group": group_index,
+                    "hash": group["hash"],
+                    "keeper": str(keeper),
+                    "keeper_size": keeper_stat.st_size,
+                    "keeper_mtime_ns": keeper_stat.st_mtime_ns,
+                    "keeper_inode": [keeper_stat.st_dev, keeper_stat.st_ino],
+                    "target": str(target),
+                    "size": target_stat.st_size,
+                    "mtime_ns": target_stat.st_mtime_ns,
+                    "mode": target_stat.st_mode & 0o7777,
+                    "inode": [target_stat.st_dev, target_stat.st_ino],
+                    "nlink": target_stat.st_nlink,
+                })
+
+        if similar_groups:
+            logger.info(f"Skipped {similar_groups} non-exact groups")
+
+        self._assign_reclaim_bytes(operations)
+        return operations
+
+    @staticmethod
+    def _assign_reclaim_bytes(operations: List[Dict]):
+        """Credit an inode's size only when every link to it is being replaced"""
+        by_inode: Dict[tuple, List[Dict]] = {}
+        keeper_inodes = {tuple(op["keeper_inode"]) for op in operations}
+        for op in operations:
+            by_inode.setdefault(tuple(op["inode"]), []).append(op)
+
+        for inode, ops in by_inode.items():
+            for op in ops:
+                op["bytes"] = 0
+            if inode in keeper_inodes:
+                continue
+            paths = {op["target"] for op in ops}
+            if len(paths) >= ops[0]["nlink"]:
+                ops[-1]["bytes"] = ops[-1]["size"]
+
+    def _keeper_hash(self, op: Dict) -> str:
+        """Hash a keeper once per run, re-hashing only if it changes on disk"""
+        try:
+            keeper_stat = os.stat(op["keeper"])
+        except OSError:
+            return ""
+        key = (op["keeper"], keeper_stat.st_size, keeper_stat.st_mtime_ns)
+        with self._keeper_lock:
+            if key in self._keeper_hashes:
+                return self._keeper_hashes[key]
+        digest = calculate_file_hash(Path(op["keeper"]))
+        with self._keeper_lock:
+            self._keeper_hashes[key] = digest
+        return digest
+
+    def verify(self, op: Dict) -> Optional[str]:
+        """Re-check size, mtime and hash of keeper and target; returns a reason on mismatch"""
+        keeper = Path(op["keeper"])
+        target = Path(op["target"])
+
+        try:
+            keeper_stat = keeper.stat()
+        except OSError:
+            return "keeper missing"
+        if (keeper_stat.st_size, keeper_stat.st_mtime_ns) != (op["keeper_size"], op["keeper_mtime_ns"]):
+            return "keeper changed since scan"
+        if self._keeper_hash(op) != op["hash"]:
+            return "keeper hash mismatch"
+
+        try:
+            target_stat = target.stat()
+        except OSError:
+            return "target missing"
+        if (target_stat.st_size, target_stat.st_mtime_ns) != (op["size"], op["mtime_ns"]):
+            return "target changed since scan"
+        if target_stat.st_size != keeper_stat.st_size:
+            return "size differs from keeper"
+        if calculate_file_hash(target) != op["hash"]:
+            return "target hash mismatch"
+        return None
+
+    @staticmethod
+    def _tmp_path(target: Path) -> Path:
+        return target.with_name(f".{target.name}{TMP_SUFFIX}")
+
+    def _reflink(self, keeper: Path, target: Path, op: Dict):
+        if not sys.platform.startswith("linux"):
+            raise MethodUnsupported("reflink", cacheable=True)
+        import fcntl
+
+        tmp = self._tmp_path(target)
+        try:
+            with open(keeper, 'rb') as src, open(tmp, 'wb') as dst:
+                try:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                except OSError as e:
+                    if e.errno in CAPABILITY_ERRNOS:
+                        raise MethodUnsupported("reflink", cacheable=True) from e
+                    if e.errno in PAIR_ERRNOS:
+                        raise MethodUnsupported("reflink") from e
+                    raise
+            os.chmod(tmp, op["mode"])
+            os.utime(tmp, ns=(op["mtime_ns"], op["mtime_ns"]))
+            os.replace(tmp, target)
+        except (OSError, MethodUnsupported):
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def _hardlink(self, keeper: Path, target: Path, op: Dict):
+        tmp = self._tmp_path(target)
+        try:
+            tmp.unlink(missing_ok=True)
+            os.link(keeper, tmp)
+            os.replace(tmp, target)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            if e.errno in PAIR_ERRNOS or e.errno in CAPABILITY_ERRNOS:
+                # Link errors are ambiguous about the filesystem, so never cache them
+                raise MethodUnsupported("hardlink") from e
+            raise
+
+    def _delete(self, keeper: Path, target: Path, op: Dict):
+        target.unlink()
+
+    def apply(self, op: Dict) -> Dict:
+        """Verify and replace one duplicate; returns the journal record for the outcome"""
+        keeper = Path(op["keeper"])
+        target = Path(op["target"])
+        self._tmp_path(target).unlink(missing_ok=True)
+
+        if self._resuming:
+            # A previous run may have linked this file before crashing
+            try:
+                if os.path.samefile(keeper, target):
+                    return {"event": "done", "seq": op["seq"], "method": "hardlink", "bytes": op["bytes"]}
+            except OSError:
+                pass
+            if not target.exists() and "delete" in self.methods and self._keeper_hash(op) == op["hash"]:
+                # ... or deleted it; record that so undo can restore it
+                return {"event": "done", "seq": op["seq"], "method": "delete", "bytes": op["bytes"]}
+
+        reason = self.verify(op)
+        if reason:
+            return {"event": "skipped", "seq": op["seq"], "reason": reason}
+
+        devices = (op["keeper_inode"][0], op["inode"][0])
+        handlers = {"reflink": self._reflink, "hardlink": self._hardlink, "delete": self._delete}
+        for method in self.methods:
+            if (*devices, method) in self._unsupported:
+                continue
+            try:
+                handlers[method](keeper, target, op)
+                return {"event": "done", "seq": op["seq"], "method": method, "bytes": op["bytes"]}
+            except MethodUnsupported as e:
+                if e.cacheable:
+                    self._unsupported.add((*devices, method))
+            except OSError as e:
+                return {"event": "failed", "seq": op["seq"], "error": str(e)}
+
+        return {"event": "failed", "seq": op["seq"], "error": f"no supported method among {self.methods}"}
+
+    def _run_batches(self, operations: List[Dict], worker) -> List[Dict]:
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for start in range(0, len(operations), self.batch_size):
+                batch = operations[start:start + self.batch_size]
+                for record in pool.map(worker, batch):
+                    self.journal.append(record)
+                    results.append(record)
+                self.journal.sync()
+                logger.info(f"Processed {min(start + self.batch_size, len(operations))}/{len(operations)} files...")
+        return results
+
+    def dry_run_report(self, operations: List[Dict]) -> Dict:
+        """Verify every operation without touching files and total the reclaimable bytes"""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            reasons = list(pool.map(self.verify, operations))
+
+        reclaimable = sum(op["bytes"] for op, reason in zip(operations, reasons) if reason is None)
+        skipped = [
+            {"target": op["target"], "reason": reason}
+            for op, reason in zip(operations, reasons) if reason
+        ]
+        return {
+            "dry_run": True,
+            "operations": len(operations),
+            "verified": len(operations) - len(skipped),
+            "skipped": skipped,
+            "bytes_reclaimable": reclaimable,
+            "space_reclaimable_mb": round(reclaimable / (1024 * 1024), 2),
+        }
+
+    def _pending_operations(self, records: List[Dict]) -> List[Dict]:
+        operations = {r["seq"]: r["op"] for r in records if r.get("event") == "intent"}
+        for record in records:
+            if record.get("event") in ("done", "skipped", "undone"):
+                operations.pop(record["seq"], None)
+        return [operations[seq] for seq in sorted(operations)]
+
+    def run(self, groups: Optional[Iterator[Dict]] = None,
+            report_identity: Optional[Dict] = None) -> Dict:
+        """Execute a new plan, or resume the one recorded in the journal"""
+        if self.journal.exists():
+            records = self.journal.load()
+            if any(r.get("event") == "undone" for r in records):
+                raise RuntimeError(f"Journal {self.journal.journal_path} has been undone; use a new journal")
+            begin = next((r for r in records if r.get("event") == "begin"), {})
+            planned = next((r for r in records if r.get("event") == "planned"), None)
+            intents = sum(1 for r in records if r.get("event") == "intent")
+            if planned is None or planned.get("operations") != intents:
+                # Nothing is touched until the plan is complete, so a fresh run is safe
+                raise RuntimeError(
+                    f"Journal {self.journal.journal_path} has an incomplete plan and no files "
+                    f"were changed; delete it and run again")
+            if report_identity is not None and begin.get("report") != report_identity:
+                raise RuntimeError(
+                    f"Journal {self.journal.journal_path} belongs to a different report "
+                    f"({begin.get('report')}); pass --journal with a new path to start a new run")
+            if begin.get("method", self.method) != self.method:
+                logger.info(f"Using method '{begin['method']}' recorded in the journal")
+                self.method = begin["method"]
+                self.methods = list(METHODS) if self.method == "auto" else [self.method]
+            operations = self._pending_operations(records)
+            self._resuming = True
+            logger.info(f"Resuming from journal: {len(operations)} operations pending")
+            if self.dry_run:
+                return self.dry_run_report(operations)
+        else:
+            if groups is None:
+                raise ValueError("A report is required to start a new run")
+            operations = self.plan(groups)
+            logger.info(f"Planned {len(operations)} operations")
+            if self.dry_run:
+                return self.dry_run_report(operations)
+
+            # Write-ahead: the whole plan is durable before any file is touched
+            self.journal.append({"event": "begin", "method": self.method,
+                                 "report": report_identity,
+                                 "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")})
+            for op in operations:
+                self.journal.append({"event": "intent", "seq": op["seq"], "op": op})
+            self.journal.append({"event": "planned", "operations": len(operations)})
+            self.journal.sync()
+
+        try:
+            results = self._run_batches(operations, self.apply)
+        finally:
+            self.journal.close()
+
+        done = [r for r in results if r["event"] == "done"]
+        reclaimed = sum(r["bytes"] for r in done)
+        methods_used: Dict[str, int] = {}
+        for record in done:
+            methods_used[record["method"]] = methods_used.get(record["method"], 0) + 1
+
+        return {
+            "dry_run": False,
+            "operations": len(operations),
+            "replaced": len(done),
+            "skipped": [r for r in results if r["event"] == "skipped"],
+            "failed": [r for r in results if r["event"] == "failed"],
+            "methods": methods_used,
+            "bytes_reclaimed": reclaimed,
+            "space_reclaimed_mb": round(reclaimed / (1024 * 1024), 2),
+            "journal": str(self.journal.journal_path),
+        }
+
+    def _restore_check(self, op: Dict) -> Optional[str]:
+        """Check the target is still exactly as the run left it; returns a reason if not"""
+        keeper = Path(op["keeper"])
+        target = Path(op["target"])
+        method = op["done_method"]
+
+        if method == "delete":
+            return "target changed since dedup" if os.path.lexists(target) else None
+
+        try:
+            if method == "hardlink":
+                return None if os.path.samefile(keeper, target) else "target changed since dedup"
+            target_stat = target.stat()
+        except OSError:
+            return "target changed since dedup"
+        if (target_stat.st_size, target_stat.st_mtime_ns) != (op["size"], op["mtime_ns"]):
+            return "target changed since dedup"
+        if calculate_file_hash(target) != op["hash"]:
+            return "target changed since dedup"
+        return None
+
+    def _restore(self, op: Dict) -> Dict:
+        """Recreate a replaced file as an independent copy of its keeper"""
+        keeper = Path(op["keeper"])
+        target = Path(op["target"])
+
+        if self._keeper_hash(op) != op["hash"]:
+            return {"event": "failed", "seq": op["seq"], "error": "keeper hash mismatch, cannot restore"}
+        reason = self._restore_check(op)
+        if reason:
+            return {"event": "failed", "seq": op["seq"], "error": reason}
+
+        tmp = self._tmp_path(target)
+        try:
+            shutil.copyfile(keeper, tmp)
+            os.chmod(tmp, op["mode"])
+            os.utime(tmp, ns=(op["mtime_ns"], op["mtime_ns"]))
+            if op["done_method"] == "delete":
+                # link() fails if a file appeared at the path since the check
+                os.link(tmp, target)
+                tmp.unlink()
+            else:
+                os.replace(tmp, target)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            if e.errno == errno.EEXIST:
+                return {"event": "failed", "seq": op["seq"], "error": "target changed since dedup"}
+            return {"event": "failed", "seq": op["seq"], "error": str(e)}
+        return {"event": "undone", "seq": op["seq"]}
+
+    def undo(self) -> Dict:
+        """Restore every file the journal records as replaced"""
+        if not self.journal.exists():
+            raise FileNotFoundError(f"Journal not found: {self.journal.journal_path}")
+
+        records = self.journal.load()
+        intents = {r["seq"]: r["op"] for r in records if r.get("event") == "intent"}
+        done = {r["seq"]: r["method"] for r in records if r.get("event") == "done"}
+        for record in records:
+            if record.get("event") == "undone":
+                done.pop(record["seq"], None)
+        operations = [dict(intents[seq], done_method=done[seq]) for seq in sorted(done, reverse=True)]
+        logger.info(f"Undoing {len(operations)} operations")
+
+        if self.dry_run:
+            return {"dry_run": True, "operations": len(operations),
+                    "targets": [op["target"] for op in operations]}
+
+        try:
+            results = self._run_batches(operations, self._restore)
+        finally:
+            self.journal.close()
+
+        return {
+            "dry_run": False,
+            "operations": len(operations),
+            "restored": len([r for r in results if r["event"] == "undone"]),
+            "failed": [r for r in results if r["event"] == "failed"],
+            "journal": str(self.journal.journal_path),
+        }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk Duplicate Executor")
+    parser.add_argument("report", nargs="?",
+                       help="Scanner report (JSON or compact), or '-' to read JSON from stdin")
+    parser.add_argument("--journal", help="Journal file path (default: <report>.journal.jsonl)")
+    parser.add_argument("--method", choices=["auto"] + list(METHODS), default="auto",
+                       help="Replacement method; auto tries reflink, then hardlink, then delete")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel I/O workers")
+    parser.add_argument("--batch-size", type=int, default=64,
+                       help="Operations per journal sync")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="Verify files and report reclaimable bytes without changing anything")
+    parser.add_argument("--undo", action="store_true", help="Restore files replaced by a journaled run")
+    parser.add_argument("--output", help="Output JSON file path")
+
+    args = parser.parse_args()
+
+    if args.journal:
+        journal_path = Path(args.journal)
+    elif args.report and args.report != "-":
+        journal_path = Path(args.report + ".journal.jsonl")
+    else:
+        logger.error("--journal is required when reading from stdin or undoing")
+        sys.exit(1)
+
+    executor = DedupExecutor(journal_path, method=args.method, workers=args.workers,
+                             batch_size=args.batch_size, dry_run=args.dry_run)
+
+    try:
+        if args.undo:
+            result = executor.undo()
+        else:
+            if not journal_path.exists() and not args.report:
+                logger.error("A report is required to start a new run")
+                sys.exit(1)
+            groups, identity = load_report(args.report) if args.report else (None, None)
+            result = executor.run(groups, identity)
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            logger.info(f"📄 Result saved to: {args.output}")
+        else:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+
+        if args.undo:
+            logger.info(f"↩️ Restored {result.get('restored', 0)} files")
+        elif args.dry_run:
+            logger.info(f"💾 Reclaimable: {result['bytes_reclaimable']} bytes")
+        else:
+            logger.info(f"💾 Reclaimed: {result['bytes_reclaimed']} bytes")
+
+    except Exception as e:
+        logger.error(f"❌ Dedup failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Knoux SmartOrganizer - I/O Throttle
+Token-bucket limits on bytes and files per second, with adaptive back-off
+driven by the system metrics feed written by the tool runner
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; reserve() returns how long the caller must wait"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else self.rate  # one second of burst
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take tokens; returns seconds to sleep until the bucket is out of debt"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Requests larger than the bucket are allowed and paid back as debt
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class IOThrottle:
+    """Per-run I/O budget for scanners: bytes/s, files/s and adaptive back-off"""
+
+    def __init__(self, max_bytes_per_sec: Optional[float] = None,
+                 max_files_per_sec: Optional[float] = None,
+                 adaptive: bool = False,
+                 metrics_feed: Optional[str] = None,
+                 target_cpu_percent: float = 80.0,
+                 target_disk_busy_percent: float = 70.0,
+                 target_load_per_cpu: float = 1.0,
+                 sample_interval: float = 2.0,
+                 max_backoff: float = 2.0):
+        self.config = {
+            "max_bytes_per_sec": max_bytes_per_sec,
+            "max_files_per_sec": max_files_per_sec,
+            "adaptive": adaptive,
+            "metrics_feed": metrics_feed,
+            "target_cpu_percent": target_cpu_percent,
+            "target_disk_busy_percent": target_disk_busy_percent,
+            "target_load_per_cpu": target_load_per_cpu,
+            "sample_interval": sample_interval,
+            "max_backoff": max_backoff,
+        }
+        self.byte_bucket = TokenBucket(max_bytes_per_sec) if max_bytes_per_sec else None
+        self.file_bucket = TokenBucket(max_files_per_sec) if max_files_per_sec else None
+        self.adaptive = adaptive
+        self.metrics_feed = Path(metrics_feed) if metrics_feed else None
+        self.target_cpu_percent = target_cpu_percent
+        self.target_disk_busy_percent = target_disk_busy_percent
+        self.target_load_per_cpu = target_load_per_cpu
+        self.sample_interval = sample_interval
+        self.max_backoff = max_backoff
+
+        self.backoff = 0.0
+        # Wall-clock time during which at least one worker was held back
+        self.throttled_seconds = 0.0
+        # Sleep time summed over workers, and the adaptive share of it
+        self.throttled_thread_seconds = 0.0
+        self.backoff_thread_seconds = 0.0
+        self._sleepers = 0
+        self._sleep_started = 0.0
+        self.bytes_read = 0
+        self.files_opened = 0
+        self._last_sample = 0.0
+        self._lock = threading.Lock()
+
+        if adaptive and self.metrics_feed is None:
+            logger.warning("Adaptive throttling requested without a metrics feed; back-off disabled")
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "IOThrottle":
+        return cls(**config)
+
+    def scaled_config(self, factor: float) -> Dict:
+        """Config with rate limits scaled, e.g. to split one budget across shard processes"""
+        config = dict(self.config)
+        for key in ("max_bytes_per_sec", "max_files_per_sec"):
+            if config[key]:
+                config[key] = config[key] * factor
+        return config
+
+    def _sleep(self, seconds: float, backoff: bool = False):
+        """Sleep, tracking the wall-clock intervals where any worker is throttled"""
+        with self._lock:
+            if self._sleepers == 0:
+                self._sleep_started = time.monotonic()
+            self._sleepers += 1
+            self.throttled_thread_seconds += seconds
+            if backoff:
+                self.backoff_thread_seconds += seconds
+        try:
+            time.sleep(seconds)
+        finally:
+            with self._lock:
+                self._sleepers -= 1
+                if self._sleepers == 0:
+                    self.throttled_seconds += time.monotonic() - self._sleep_started
+
+    def acquire_bytes(self, amount: int):
+        """Account for bytes read, sleeping while over the bandwidth budget"""
+        with self._lock:
+            self.bytes_read += amount
+        if self.byte_bucket is not None:
+            wait = self.byte_bucket.reserve(amount)
+            if wait > 0:
+                self._sleep(wait)
+
+    def acquire_file(self):
+        """Account for a file about to be opened, applying adaptive back-off"""
+        with self._lock:
+            self.files_opened += 1
+        if self.file_bucket is not None:
+            wait = self.file_bucket.reserve(1)
+            if wait > 0:
+                self._sleep(wait)
+
+        if self.adaptive:
+            self._update_backoff()
+            if self.backoff:
+                self._sleep(self.backoff, backoff=True)
+
+    def _update_backoff(self):
+        """Re-read the metrics feed at most once per sample interval"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sample < self.sample_interval:
+                return
+            self._last_sample = now
+
+        overloaded = self._system_overloaded()
+        with self._lock:
+            if overloaded:
+                self.backoff = min(self.max_backoff, max(self.backoff * 2, 0.01))
+            else:
+                self.backoff /= 2
+                if self.backoff < 0.01:
+                    self.backoff = 0.0
+
+    def _system_overloaded(self) -> bool:
+        """Compare the latest runner metrics against the targets"""
+        if self.metrics_feed is None:
+            return False
+        try:
+            # Ignore a feed that has stopped updating
+            if time.time() - self.metrics_feed.stat().st_mtime > self.sample_interval * 10 + 30:
+                return False
+            with open(self.metrics_feed, 'r', encoding='utf-8') as f:
+                metrics = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+
+        cpu = metrics.get("cpu", {}).get("usage_percent", 0)
+        disk_busy = metrics.get("disk", {}).get("busy_percent", 0)
+        load = metrics.get("load", {}).get("per_cpu", 0)
+        return (cpu > self.target_cpu_percent
+                or disk_busy > self.target_disk_busy_percent
+                or load > self.target_load_per_cpu)
+
+    def stats(self) -> Dict:
+        return {
+            "throttled_seconds": round(self.throttled_seconds, 2),
+            "throttled_thread_seconds": round(self.throttled_thread_seconds, 2),
+            "adaptive_backoff_thread_seconds": round(self.backoff_thread_seconds, 2),
+            "bytes_read": self.bytes_read,
+            "files_opened": self.files_opened,
+            "config": self.config,
+        }
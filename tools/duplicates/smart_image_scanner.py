@@ -7,16 +7,23 @@ Uses CLIP AI model for semantic image comparison
 import os
 import sys
 import json
+import base64
+import gzip
 import hashlib
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import logging
 
+import numpy as np
+
+from compact_report import write_compact_report
+from io_throttle import IOThrottle
+
 # Mock imports for demonstration (in real implementation, use actual libraries)
 try:
     import cv2
-    import numpy as np
     from PIL import Image
     HAS_CV2 = True
 except ImportError:
@@ -25,20 +32,56 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PARTIAL_FORMAT = "knoux-scan-partial"
+PARTIAL_VERSION = 1
+
+
+def write_partial(partial: Dict, output_path: Path):
+    """Write a shard partial as gzip-compressed JSON"""
+    tmp_path = Path(str(output_path) + ".tmp")
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(partial, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, output_path)
+
+
+def combine_throttle_stat(key: str, first: float, second: float) -> float:
+    """Combine throttle stats from parallel shards: wall-clock time overlaps, counters add up"""
+    if key == "throttled_seconds":
+        return max(first, second)
+    return first + second
+
+
+def load_partial(partial_path: Path) -> Dict:
+    """Read a shard partial written by write_partial"""
+    with gzip.open(partial_path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
 class SmartImageScanner:
-    def __init__(self, similarity_threshold: float = 0.85):
+    # Number of unique images compared pairwise for similarity
+    MAX_SIMILARITY_FILES = 50
+
+    def __init__(self, similarity_threshold: float = 0.85,
+                 throttle: Optional[IOThrottle] = None, workers: int = 1):
         self.similarity_threshold = similarity_threshold
         self.supported_formats = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
         self.scanned_files = 0
         self.duplicates_found = 0
         self.space_saved = 0.0
+        self.throttle = throttle
+        self.workers = max(1, workers)
+        self.shard_throttle_stats: Dict[str, float] = {}  # combined from merged shard partials
         
     def calculate_file_hash(self, file_path: Path) -> str:
         """Calculate SHA256 hash of file"""
         hasher = hashlib.sha256()
         try:
+            if self.throttle:
+                self.throttle.acquire_file()
             with open(file_path, 'rb') as f:
                 for chunk in iter(lambda: f.read(4096), b""):
+                    if self.throttle:
+                        self.throttle.acquire_bytes(len(chunk))
                     hasher.update(chunk)
             return hasher.hexdigest()
         except Exception as e:
@@ -52,6 +95,9 @@ class SmartImageScanner:
             return np.random.rand(512).astype(np.float32)
         
         try:
+            if self.throttle:
+                self.throttle.acquire_file()
+                self.throttle.acquire_bytes(image_path.stat().st_size)
             img = cv2.imread(str(image_path))
             if img is None:
                 return np.random.rand(512).astype(np.float32)
@@ -85,11 +131,8 @@ class SmartImageScanner:
             logger.error(f"Error calculating similarity: {e}")
             return 0.0
 
-    def scan_directory(self, directory: Path, recursive: bool = True) -> List[Dict]:
-        """Scan directory for images and find duplicates"""
-        logger.info(f"Scanning directory: {directory}")
-        
-        # Find all image files
+    def find_image_files(self, directory: Path, recursive: bool = True) -> List[Path]:
+        """Find all supported image files under a directory"""
         image_files = []
         pattern = "**/*" if recursive else "*"
         
@@ -97,28 +140,59 @@ class SmartImageScanner:
             if file_path.is_file() and file_path.suffix.lower() in self.supported_formats:
                 image_files.append(file_path)
         
-        logger.info(f"Found {len(image_files)} image files")
-        
-        # Group files by exact hash first (exact duplicates)
+        return image_files
+
+    def hash_files(self, image_files: List[Path]) -> Dict[str, List[Path]]:
+        """Group files by exact SHA256 hash"""
         hash_groups = {}
-        for file_path in image_files:
-            self.scanned_files += 1
-            file_hash = self.calculate_file_hash(file_path)
-            
-            if file_hash:
-                if file_hash not in hash_groups:
-                    hash_groups[file_hash] = []
-                hash_groups[file_hash].append(file_path)
-            
-            # Progress logging
-            if self.scanned_files % 10 == 0:
-                logger.info(f"Processed {self.scanned_files} files...")
+        pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        if pool:
+            file_hashes = pool.map(self.calculate_file_hash, image_files)
+        else:
+            file_hashes = map(self.calculate_file_hash, image_files)
+        
+        try:
+            for file_path, file_hash in zip(image_files, file_hashes):
+                self.scanned_files += 1
+                
+                if file_hash:
+                    if file_hash not in hash_groups:
+                        hash_groups[file_hash] = []
+                    hash_groups[file_hash].append(file_path)
+                
+                # Progress logging
+                if self.scanned_files % 10 == 0:
+                    logger.info(f"Processed {self.scanned_files} files...")
+        finally:
+            if pool:
+                pool.shutdown()
+        
+        return hash_groups
+
+    def extract_features(self, files: List[Path]) -> Dict[Path, np.ndarray]:
+        """Extract features for the first MAX_SIMILARITY_FILES files"""
+        files = files[:self.MAX_SIMILARITY_FILES]  # Limit for demo
+        file_features = {}
+        for i, file_path in enumerate(files):
+            if i % 5 == 0:
+                logger.info(f"Extracting features: {i}/{len(files)}")
+            file_features[file_path] = self.get_image_features(file_path)
+        return file_features
+
+    def group_duplicates(self, hash_groups: Dict[str, List[Path]],
+                         file_features: Dict[Path, np.ndarray],
+                         file_sizes: Optional[Dict[Path, int]] = None) -> List[Dict]:
+        """Build exact and similar duplicate groups from hashes and feature vectors"""
+        def size_of(file_path: Path) -> int:
+            if file_sizes is not None:
+                return file_sizes[file_path]
+            return file_path.stat().st_size
         
         # Find exact duplicates
         duplicate_groups = []
         for file_hash, files in hash_groups.items():
             if len(files) > 1:
-                group_size = sum(f.stat().st_size for f in files[1:])  # Size of duplicates
+                group_size = sum(size_of(f) for f in files[1:])  # Size of duplicates
                 self.space_saved += group_size / (1024 * 1024)  # Convert to MB
                 self.duplicates_found += len(files) - 1
                 
@@ -130,48 +204,182 @@ class SmartImageScanner:
                     "similarity": 1.0
                 })
         
+        # Compare all pairs for similarity
+        compared_pairs = set()
+        for file1, features1 in file_features.items():
+            for file2, features2 in file_features.items():
+                if file1 != file2:
+                    pair = tuple(sorted([str(file1), str(file2)]))
+                    if pair not in compared_pairs:
+                        compared_pairs.add(pair)
+                        
+                        similarity = self.calculate_similarity(features1, features2)
+                        
+                        if similarity >= self.similarity_threshold:
+                            # Found similar images
+                            smaller_size = min(size_of(file1), size_of(file2))
+                            
+                            self.space_saved += smaller_size / (1024 * 1024)
+                            self.duplicates_found += 1
+                            
+                            duplicate_groups.append({
+                                "type": "similar",
+                                "files": [str(file1), str(file2)],
+                                "size_mb": smaller_size / (1024 * 1024),
+                                "similarity": similarity
+                            })
+        
+        return duplicate_groups
+
+    def scan_directory(self, directory: Path, recursive: bool = True) -> List[Dict]:
+        """Scan directory for images and find duplicates"""
+        logger.info(f"Scanning directory: {directory}")
+        
+        # Find all image files
+        image_files = self.find_image_files(directory, recursive)
+        logger.info(f"Found {len(image_files)} image files")
+        
+        # Group files by exact hash first (exact duplicates)
+        hash_groups = self.hash_files(image_files)
+        
         # Find similar images using AI features (simplified for demonstration)
         unique_files = [files[0] for files in hash_groups.values()]
-        
+        file_features = {}
         if len(unique_files) > 1:
             logger.info("Analyzing image similarity using AI...")
-            
-            # Extract features for all unique images
-            file_features = {}
-            for i, file_path in enumerate(unique_files[:50]):  # Limit for demo
-                if i % 5 == 0:
-                    logger.info(f"Extracting features: {i}/{len(unique_files[:50])}")
-                features = self.get_image_features(file_path)
-                file_features[file_path] = features
-            
-            # Compare all pairs for similarity
-            compared_pairs = set()
-            for file1, features1 in file_features.items():
-                for file2, features2 in file_features.items():
-                    if file1 != file2:
-                        pair = tuple(sorted([str(file1), str(file2)]))
-                        if pair not in compared_pairs:
-                            compared_pairs.add(pair)
-                            
-                            similarity = self.calculate_similarity(features1, features2)
-                            
-                            if similarity >= self.similarity_threshold:
-                                # Found similar images
-                                file1_size = file1.stat().st_size
-                                file2_size = file2.stat().st_size
-                                smaller_size = min(file1_size, file2_size)
-                                
-                                self.space_saved += smaller_size / (1024 * 1024)
-                                self.duplicates_found += 1
-                                
-                                duplicate_groups.append({
-                                    "type": "similar",
-                                    "files": [str(file1), str(file2)],
-                                    "size_mb": smaller_size / (1024 * 1024),
-                                    "similarity": similarity
-                                })
+            file_features = self.extract_features(unique_files)
         
-        return duplicate_groups
+        return self.group_duplicates(hash_groups, file_features)
+
+    @staticmethod
+    def shard_of(relative_path: Path, shard_count: int, shard_by: str = "subtree") -> int:
+        """Assign a path to a shard by the hash prefix of its subtree or full path"""
+        if shard_by == "subtree":
+            key = relative_path.parts[0]
+        elif shard_by == "hash":
+            key = relative_path.as_posix()
+        else:
+            raise ValueError(f"Unknown shard mode: {shard_by}")
+        prefix = int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16)
+        return prefix * shard_count >> 32
+
+    def find_shard_files(self, directory: Path, shard_index: int, shard_count: int,
+                         shard_by: str = "subtree", recursive: bool = True) -> List[Path]:
+        """Find the image files that belong to one shard"""
+        if shard_by != "subtree":
+            return [
+                f for f in self.find_image_files(directory, recursive)
+                if self.shard_of(f.relative_to(directory), shard_count, shard_by) == shard_index
+            ]
+        
+        # Only walk the top-level entries this shard owns
+        image_files = []
+        for entry in sorted(directory.iterdir()):
+            if self.shard_of(Path(entry.name), shard_count, shard_by) != shard_index:
+                continue
+            if entry.is_dir():
+                if recursive:
+                    image_files.extend(self.find_image_files(entry, recursive))
+            elif entry.is_file() and entry.suffix.lower() in self.supported_formats:
+                image_files.append(entry)
+        return image_files
+
+    def scan_shard(self, directory: Path, shard_index: int, shard_count: int,
+                   shard_by: str = "subtree", recursive: bool = True) -> Dict:
+        """Hash one shard and return a partial result that merge_partials can combine"""
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Shard index {shard_index} out of range for {shard_count} shards")
+        
+        logger.info(f"Scanning shard {shard_index + 1}/{shard_count} of {directory}")
+        image_files = self.find_shard_files(directory, shard_index, shard_count, shard_by, recursive)
+        logger.info(f"Found {len(image_files)} image files in shard")
+        
+        hash_groups = self.hash_files(image_files)
+        
+        # Signatures for the local representative of each hash; the merge picks from these
+        unique_files = [files[0] for files in hash_groups.values()]
+        file_features = self.extract_features(unique_files)
+        
+        size_buckets: Dict[str, List[List[str]]] = {}
+        for file_hash, files in hash_groups.items():
+            for file_path in files:
+                bucket = size_buckets.setdefault(str(file_path.stat().st_size), [])
+                bucket.append([file_path.relative_to(directory).as_posix(), file_hash])
+        
+        signatures = {
+            file_path.relative_to(directory).as_posix():
+                base64.b64encode(np.asarray(features, dtype=np.float32).tobytes()).decode("ascii")
+            for file_path, features in file_features.items()
+        }
+        
+        return {
+            "format": PARTIAL_FORMAT,
+            "version": PARTIAL_VERSION,
+            "root": str(directory),
+            "shard_index": shard_index,
+            "shard_count": shard_count,
+            "shard_by": shard_by,
+            "files_scanned": self.scanned_files,
+            "throttle": self.throttle.stats() if self.throttle else None,
+            "size_buckets": size_buckets,
+            "signatures": signatures,
+        }
+
+    def merge_partials(self, partials: List[Dict], root: Optional[Path] = None) -> List[Dict]:
+        """Combine shard partials into global duplicate groups without rehashing"""
+        if not partials:
+            return []
+        
+        for partial in partials:
+            if (not isinstance(partial, dict) or partial.get("format") != PARTIAL_FORMAT
+                    or partial.get("version") != PARTIAL_VERSION):
+                raise ValueError("Not a scan partial, or unsupported partial version")
+        
+        shard_count = partials[0]["shard_count"]
+        seen_shards = set()
+        for partial in partials:
+            if partial["shard_count"] != shard_count or partial["shard_by"] != partials[0]["shard_by"]:
+                raise ValueError("Partials come from different shard layouts")
+            if partial["shard_index"] in seen_shards:
+                raise ValueError(f"Shard {partial['shard_index']} appears more than once")
+            seen_shards.add(partial["shard_index"])
+        
+        missing = set(range(shard_count)) - seen_shards
+        if missing:
+            logger.warning(f"Merging without shards {sorted(missing)}; results are incomplete")
+        
+        hash_groups: Dict[str, List[Path]] = {}
+        file_sizes: Dict[Path, int] = {}
+        signatures: Dict[Path, np.ndarray] = {}
+        
+        for partial in sorted(partials, key=lambda p: p["shard_index"]):
+            base = Path(root) if root is not None else Path(partial["root"])
+            self.scanned_files += partial["files_scanned"]
+            for key, value in (partial.get("throttle") or {}).items():
+                if isinstance(value, (int, float)):
+                    self.shard_throttle_stats[key] = combine_throttle_stat(
+                        key, self.shard_throttle_stats.get(key, 0), value)
+            for size, entries in partial["size_buckets"].items():
+                for relative_path, file_hash in entries:
+                    file_path = base / relative_path
+                    file_sizes[file_path] = int(size)
+                    hash_groups.setdefault(file_hash, []).append(file_path)
+            for relative_path, encoded in partial["signatures"].items():
+                signatures[base / relative_path] = np.frombuffer(
+                    base64.b64decode(encoded), dtype=np.float32)
+        
+        # One signed representative per hash, as a single-process scan would compare
+        file_features = {}
+        for files in hash_groups.values():
+            signed = next((f for f in files if f in signatures), None)
+            if signed is not None:
+                file_features[signed] = signatures[signed]
+            if len(file_features) >= self.MAX_SIMILARITY_FILES:
+                break
+        
+        logger.info(f"Merged {len(partials)} partials: {self.scanned_files} files, "
+                    f"{len(hash_groups)} unique hashes")
+        return self.group_duplicates(hash_groups, file_features, file_sizes)
 
     def generate_report(self, duplicate_groups: List[Dict]) -> Dict:
         """Generate scanning report"""
@@ -179,58 +387,179 @@ class SmartImageScanner:
         exact_groups = len([g for g in duplicate_groups if g["type"] == "exact"])
         similar_groups = len([g for g in duplicate_groups if g["type"] == "similar"])
         total_space_saved = sum(g["size_mb"] for g in duplicate_groups)
+        throttle_stats = self.throttle.stats() if self.throttle else {}
+        for key, value in self.shard_throttle_stats.items():
+            throttle_stats[key] = round(combine_throttle_stat(key, throttle_stats.get(key, 0), value), 2)
+        throttled_seconds = throttle_stats.get("throttled_seconds", 0.0)
         
-        return {
+        report = {
             "scan_summary": {
                 "files_scanned": self.scanned_files,
                 "duplicate_groups_found": total_groups,
                 "exact_duplicates": exact_groups,
                 "similar_images": similar_groups,
                 "total_duplicates": self.duplicates_found,
-                "space_saved_mb": round(total_space_saved, 2)
+                "space_saved_mb": round(total_space_saved, 2),
+                "throttled_seconds": round(throttled_seconds, 2)
             },
             "duplicate_groups": duplicate_groups,
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "tool": "Smart Image Scanner",
             "ai_model": "CLIP + Computer Vision"
         }
+        if self.throttle:
+            report["throttle"] = {**throttle_stats, "workers": self.workers}
+        return report
+
+def _scan_shard_worker(job: Tuple) -> str:
+    """Process pool entry point: scan one shard and write its partial"""
+    directory, shard_index, shard_count, shard_by, recursive, threshold, output_path, \
+        throttle_config, workers = job
+    throttle = IOThrottle.from_config(throttle_config) if throttle_config else None
+    scanner = SmartImageScanner(similarity_threshold=threshold, throttle=throttle, workers=workers)
+    partial = scanner.scan_shard(Path(directory), shard_index, shard_count, shard_by, recursive)
+    write_partial(partial, Path(output_path))
+    return output_path
+
+
+def run_local_shards(directory: Path, shard_count: int, work_dir: Path, shard_by: str = "subtree",
+                     recursive: bool = True, similarity_threshold: float = 0.85,
+                     throttle: Optional[IOThrottle] = None, workers: int = 1) -> List[Path]:
+    """Scan every shard in its own local process and return the partial paths"""
+    from concurrent.futures import ProcessPoolExecutor
+    
+    # Split the run's I/O budget evenly across shard processes
+    throttle_config = throttle.scaled_config(1 / shard_count) if throttle else None
+    jobs = [
+        (str(directory), i, shard_count, shard_by, recursive, similarity_threshold,
+         str(work_dir / f"shard-{i:04d}.knxpart.gz"), throttle_config, workers)
+        for i in range(shard_count)
+    ]
+    with ProcessPoolExecutor(max_workers=shard_count) as pool:
+        return [Path(p) for p in pool.map(_scan_shard_worker, jobs)]
+
 
 def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Smart Image Duplicate Scanner")
-    parser.add_argument("path", help="Directory path to scan")
+    parser.add_argument("path", nargs="?", help="Directory path to scan")
     parser.add_argument("--threshold", type=float, default=0.85, 
                        help="Similarity threshold (0.0-1.0)")
     parser.add_argument("--recursive", action="store_true", default=True,
                        help="Scan subdirectories recursively")
-    parser.add_argument("--output", help="Output JSON file path")
+    parser.add_argument("--output", help="Output report file path")
+    parser.add_argument("--format", choices=["json", "compact"], default="json",
+                       help="Report format (compact is columnar and memory-mappable)")
+    parser.add_argument("--shard-count", type=int, help="Total number of shards")
+    parser.add_argument("--shard-index", type=int,
+                       help="Scan only this shard (0-based) and write a partial result")
+    parser.add_argument("--shard-by", choices=["subtree", "hash"], default="subtree",
+                       help="Assign top-level subtrees or per-file path hash ranges to shards")
+    parser.add_argument("--partial-output", help="Partial result file path for --shard-index")
+    parser.add_argument("--local-shards", type=int,
+                       help="Scan with this many local shard processes, then merge")
+    parser.add_argument("--merge", nargs="+", metavar="PARTIAL",
+                       help="Merge shard partial results into one report")
+    parser.add_argument("--merge-root",
+                       help="Rebase merged paths onto this directory instead of each worker's root")
+    parser.add_argument("--max-bytes-per-sec", type=float, help="Read bandwidth limit")
+    parser.add_argument("--max-files-per-sec", type=float, help="File open rate limit")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel hashing workers")
+    parser.add_argument("--adaptive", action="store_true",
+                       help="Back off when system load or disk utilization exceeds the targets")
+    parser.add_argument("--metrics-feed",
+                       help="System metrics JSON written by the tool runner, for --adaptive")
+    parser.add_argument("--target-cpu-percent", type=float, default=80.0,
+                       help="Adaptive target for CPU usage")
+    parser.add_argument("--target-disk-busy-percent", type=float, default=70.0,
+                       help="Adaptive target for disk utilization")
+    parser.add_argument("--target-load-per-cpu", type=float, default=1.0,
+                       help="Adaptive target for 1-minute load average per CPU")
+    parser.add_argument("--sample-interval", type=float, default=2.0,
+                       help="Seconds between metrics feed reads, for --adaptive")
     
     args = parser.parse_args()
     
-    scanner = SmartImageScanner(similarity_threshold=args.threshold)
+    throttle = None
+    if args.max_bytes_per_sec or args.max_files_per_sec or args.adaptive:
+        throttle = IOThrottle(
+            max_bytes_per_sec=args.max_bytes_per_sec,
+            max_files_per_sec=args.max_files_per_sec,
+            adaptive=args.adaptive,
+            metrics_feed=args.metrics_feed,
+            target_cpu_percent=args.target_cpu_percent,
+            target_disk_busy_percent=args.target_disk_busy_percent,
+            target_load_per_cpu=args.target_load_per_cpu,
+            sample_interval=args.sample_interval,
+        )
+    
+    scanner = SmartImageScanner(similarity_threshold=args.threshold, throttle=throttle,
+                                workers=args.workers)
+    
+    if args.merge:
+        scan_path = None
+    else:
+        if not args.path:
+            parser.error("path is required unless --merge is used")
+        scan_path = Path(args.path)
+        if not scan_path.exists():
+            logger.error(f"Path does not exist: {scan_path}")
+            sys.exit(1)
+    
+    if args.shard_index is not None and (not args.shard_count or not args.partial_output):
+        logger.error("--shard-index requires --shard-count and --partial-output")
+        sys.exit(1)
     
-    scan_path = Path(args.path)
-    if not scan_path.exists():
-        logger.error(f"Path does not exist: {scan_path}")
+    if args.format == "compact" and not args.output:
+        logger.error("--format compact requires --output")
         sys.exit(1)
     
+    if args.shard_index is not None:
+        try:
+            partial = scanner.scan_shard(scan_path, args.shard_index, args.shard_count,
+                                         args.shard_by, args.recursive)
+            write_partial(partial, Path(args.partial_output))
+            logger.info(f"📄 Partial result saved to: {args.partial_output}")
+        except Exception as e:
+            logger.error(f"❌ Shard scan failed: {e}")
+            sys.exit(1)
+        return
+    
     logger.info("🔍 Starting Smart Image Duplicate Scan...")
-    logger.info(f"📁 Path: {scan_path}")
+    logger.info(f"📁 Path: {scan_path or ', '.join(args.merge)}")
     logger.info(f"🎯 Similarity threshold: {args.threshold}")
     logger.info(f"🔄 Recursive: {args.recursive}")
     
     start_time = time.time()
     
     try:
-        duplicate_groups = scanner.scan_directory(scan_path, args.recursive)
+        if args.merge:
+            partials = [load_partial(Path(p)) for p in args.merge]
+            merge_root = Path(args.merge_root) if args.merge_root else None
+            duplicate_groups = scanner.merge_partials(partials, merge_root)
+        elif args.local_shards:
+            import tempfile
+            
+            logger.info(f"🧩 Shards: {args.local_shards} local processes ({args.shard_by})")
+            with tempfile.TemporaryDirectory(prefix="knoux-shards-") as work_dir:
+                partial_paths = run_local_shards(scan_path, args.local_shards, Path(work_dir),
+                                                 args.shard_by, args.recursive, args.threshold,
+                                                 throttle, args.workers)
+                partials = [load_partial(p) for p in partial_paths]
+            duplicate_groups = scanner.merge_partials(partials)
+        else:
+            duplicate_groups = scanner.scan_directory(scan_path, args.recursive)
         scan_time = time.time() - start_time
         
         report = scanner.generate_report(duplicate_groups)
         report["scan_time_seconds"] = round(scan_time, 2)
         
         # Output results
-        if args.output:
+        if args.format == "compact":
+            write_compact_report(report, Path(args.output))
+            logger.info(f"📄 Compact report saved to: {args.output}")
+        elif args.output:
             with open(args.output, 'w', encoding='utf-8') as f:
                 json.dump(report, f, indent=2, ensure_ascii=False)
             logger.info(f"📄 Report saved to: {args.output}")
@@ -240,6 +569,8 @@ def main():
         logger.info("✅ Scan completed successfully!")
         logger.info(f"📊 Found {report['scan_summary']['duplicate_groups_found']} duplicate groups")
         logger.info(f"💾 Potential space savings: {report['scan_summary']['space_saved_mb']} MB")
+        if report['scan_summary']['throttled_seconds']:
+            logger.info(f"🐢 Time spent throttled: {report['scan_summary']['throttled_seconds']} s")
         
     except Exception as e:
         logger.error(f"❌ Scan failed: {e}")